@@ -1,16 +1,72 @@
 import os
+import sys
+import time
+import asyncio
+import hashlib
+import orjson
 from dotenv import load_dotenv
 from langchain_tavily import TavilySearch
-from langchain_ollama.chat_models import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 import json
 from self_editor.generate_selfedit import generate_self_edit
 from self_editor.validate import validate_self_edit
 from self_editor.save import append_self_edit
-from self_editor.review_selfedits import review_entry_with_llm
+from self_editor.review_selfedits import review_entry_with_llm, get_review_llm
+from self_editor._llm import get_llm
 
+# exact-match cache of Tavily results, keyed by normalized question
+SEARCH_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "search_cache")
+SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds
 
-def main():
+
+async def _cached_search(search, question: str):
+    """Return Tavily results for `question`, reusing an on-disk copy younger than SEARCH_CACHE_TTL."""
+    key = hashlib.blake2b(question.strip().lower().encode("utf-8"), digest_size=16).hexdigest()
+    path = os.path.join(SEARCH_CACHE_DIR, f"{key}.json")
+    try:
+        if os.path.getmtime(path) > time.time() - SEARCH_CACHE_TTL:
+            with open(path, "rb") as fh:
+                return orjson.loads(fh.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+
+    results = await search.ainvoke({"query": question})
+    try:
+        os.makedirs(SEARCH_CACHE_DIR, exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(orjson.dumps(results))
+    except (OSError, TypeError) as e:
+        print(f"[Search Cache] Not cached: {e}")
+    return results
+
+
+def _compact_results(search_results, max_chars: int = 3000) -> str:
+    """
+    Flatten Tavily results into plain 'title / url / content' blocks separated by '---',
+    capped at `max_chars`, so the self-edit prompt carries text rather than JSON noise.
+    """
+    items = search_results.get("results", []) if isinstance(search_results, dict) else search_results
+    if not isinstance(items, list):
+        return str(search_results or "")[:max_chars]
+
+    blocks = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        parts = [str(item.get(k) or "").strip() for k in ("title", "url", "content")]
+        blocks.append("\n".join(p for p in parts if p))
+    return "\n---\n".join(b for b in blocks if b)[:max_chars]
+
+
+async def _warm_up(llm) -> None:
+    """Ask Ollama for a single token so the model is loaded before the real prompt arrives."""
+    try:
+        await llm.ainvoke("ping", options={"num_predict": 1})
+    except Exception as e:
+        print(f"[Warm-up] Skipped: {e}")
+
+
+async def amain():
     # 1. Load Environment
     load_dotenv()
     if not os.getenv("TAVILY_API_KEY"):
@@ -19,12 +75,16 @@ def main():
 
     # 2. Initialize Tools
     search = TavilySearch(max_results=3)
-    llm = ChatOllama(model="llama3.1:8b-instruct-q4_K_M", temperature=0)
+    llm = get_llm()
 
     # 3. Ask User Question
     question = input("\n> Enter your research question: ")
     print("Searching web...")
-    search_results = search.invoke({"query": question})
+    # overlap the web search with Ollama loading the model
+    search_results, _ = await asyncio.gather(
+        _cached_search(search, question),
+        _warm_up(llm),
+    )
 
     # 4. Prepare Prompt
     prompt = ChatPromptTemplate.from_template("""
@@ -38,19 +98,14 @@ Using these results, write a clear, accurate, and concise answer to the user's q
 
     chain = prompt | llm
 
-    # 5. Generate Answer
-    response = chain.invoke({"context": search_results, "question": question})
+    # 5. Generate Answer (streamed so the first tokens show up immediately)
     print("\n--- FINAL RESPONSE ---")
-    print(response.content if hasattr(response, "content") else response)
+    async for chunk in chain.astream({"context": search_results, "question": question}):
+        sys.stdout.write(chunk.content if hasattr(chunk, "content") else str(chunk))
+        sys.stdout.flush()
+    print()
     print("\n[Phase 2] Generating self-edit from the answer...")
-    try:
-        search_snapshot = json.dumps(search_results, ensure_ascii=False)
-    except Exception:
-        try:
-            search_snapshot = str(search_results)
-        except Exception:
-            search_snapshot = ""
-    raw_edit = generate_self_edit(topic=question, context=search_snapshot)
+    raw_edit = generate_self_edit(topic=question, context=_compact_results(search_results))
     if not raw_edit:
         print("[Self-Editor] No structured output from generator. Self-edit not created.")
     else:
@@ -64,7 +119,7 @@ Using these results, write a clear, accurate, and concise answer to the user's q
             if appended:
                 print(f"[Self-Editor] Saved new self-edit to: {out_path}")
                 try:
-                    review_result = review_entry_with_llm(llm, cleaned)
+                    review_result = review_entry_with_llm(get_review_llm(), cleaned)
                     print("\n[Self-Editor Review] ------------------------")
                     print(json.dumps(review_result, indent=2))
                     print("[Self-Editor Review] ------------------------\n")
@@ -74,4 +129,4 @@ Using these results, write a clear, accurate, and concise answer to the user's q
                 print("[Self-Editor] Duplicate detected — not appended.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(amain())
@@ -0,0 +1,56 @@
+# self_editor/_llm.py
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from langchain_ollama.chat_models import ChatOllama
+
+# user-facing research answers; override with OLLAMA_MODEL
+DEFAULT_MODEL = "llama3.1:8b-instruct-q4_0"
+# bounded self-edit generation / review jobs; override with OLLAMA_REVIEW_MODEL
+REVIEW_MODEL = "llama3.2:3b-instruct-q4_K_M"
+
+# keep the model resident in Ollama between calls instead of reloading it each time
+KEEP_ALIVE = "30m"
+
+# one shared ChatOllama (and its HTTP connection pool) per distinct configuration
+_LLMS: Dict[Tuple[Tuple[str, Any], ...], ChatOllama] = {}
+
+def review_model() -> str:
+    """Model used for self-edit generation and review (read at call time so .env applies)."""
+    return os.getenv("OLLAMA_REVIEW_MODEL") or REVIEW_MODEL
+
+def build_llm(model: Optional[str] = None, **options: Any) -> ChatOllama:
+    """
+    Build a new, unshared ChatOllama with the same defaults as get_llm().
+    Use this for async work under asyncio.run(): the async HTTP client binds its
+    connections to the running event loop, so it must not outlive that loop.
+    """
+    model = model or os.getenv("OLLAMA_MODEL") or DEFAULT_MODEL
+    params = {"temperature": 0, "keep_alive": KEEP_ALIVE}
+    params.update(options)
+    return ChatOllama(
+        model=model,
+        client_kwargs={"limits": httpx.Limits(max_keepalive_connections=8)},
+        **params,
+    )
+
+async def aclose_llm(llm: ChatOllama) -> None:
+    """Close the async HTTP connections of an LLM built with build_llm()."""
+    client = getattr(llm, "_async_client", None)
+    if client is not None:
+        await client.close()
+
+def get_llm(model: Optional[str] = None, **options: Any) -> ChatOllama:
+    """
+    Return a process-wide ChatOllama for `model` (default: $OLLAMA_MODEL or DEFAULT_MODEL),
+    built lazily on first use. Extra keyword arguments (e.g. num_predict) are passed to
+    ChatOllama and select a separate cached instance.
+    """
+    model = model or os.getenv("OLLAMA_MODEL") or DEFAULT_MODEL
+    key = (("model", model),) + tuple(sorted(options.items()))
+    llm = _LLMS.get(key)
+    if llm is None:
+        llm = build_llm(model, **options)
+        _LLMS[key] = llm
+    return llm
@@ -1,11 +1,17 @@
 import json
-from langchain_ollama.chat_models import ChatOllama
+import orjson
+
+try:
+    from self_editor._llm import get_llm, review_model
+except ImportError:  # executed as a script from inside self_editor/
+    from _llm import get_llm, review_model
 
 def generate_self_edit(topic: str, context: str = "") -> dict:
     """
     Given a topic and optional web context, ask the local LLM to produce a self-edit (Q/A pair).
     """
-    llm = ChatOllama(model="llama3.1:8b-instruct-q4_K_M", temperature=0)
+    # JSON mode: Ollama constrains decoding so the reply is always a valid JSON document
+    llm = get_llm(review_model(), format="json")
 
     prompt = f"""
 You are a research assistant designed to generate a structured 'self-edit' for model improvement.
@@ -23,16 +29,13 @@ Respond ONLY in strict JSON format like this:
 }}
     """
 
+    text = ""
     try:
         response = llm.invoke(prompt)
-        text = response.content.strip()
-
-        # Try parsing JSON; fall back if the model adds extra text
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        json_text = text[start:end]
+        text = response.content
 
-        data = json.loads(json_text)
+        data = orjson.loads(text)
+        assert isinstance(data, dict), "Generated JSON is not an object."
         assert "question" in data and "answer" in data, "Missing keys in generated JSON."
         return data
 
@@ -1,11 +1,19 @@
 import os
-import json
+import asyncio
+import hashlib
 import re
-from typing import Dict, Any, Optional
+import orjson
+import numpy as np
+from typing import BinaryIO, Dict, Any, List, Optional, Set
 
 # Local LLM
 from langchain_ollama.chat_models import ChatOllama
 
+try:
+    from self_editor._llm import aclose_llm, build_llm, get_llm, review_model
+except ImportError:  # executed as a script from inside self_editor/
+    from _llm import aclose_llm, build_llm, get_llm, review_model
+
 # configurable paths
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DEFAULT_INPUT_PATH = os.path.join(PROJECT_ROOT, "data", "self_edits.jsonl")
@@ -14,19 +22,70 @@ DEFAULT_OUTPUT_PATH = os.path.join(PROJECT_ROOT, "data", "self_edits_reviewed.js
 # threshold for automatic approval
 APPROVAL_THRESHOLD = 0.70
 
+# aggregate score weights for (accuracy, clarity, novelty)
+_SCORE_WEIGHTS = (0.5, 0.3, 0.2)
+
+# default number of review requests kept in flight against the Ollama server
+# (the script reads REVIEW_CONCURRENCY from the environment, see __main__)
+REVIEW_CONCURRENCY = 4
+
+# how many parsed entries the reader may queue ahead of the reviewers
+READ_AHEAD = 64
+
+# fsync the reviewed file every N records so a crash loses at most that many
+FSYNC_EVERY = 100
+
+# reviews are short JSON objects, so cap generation length
+REVIEW_MAX_TOKENS = 256
+
+def get_review_llm() -> ChatOllama:
+    """Shared LLM instance configured for scoring self-edits."""
+    # JSON mode: Ollama constrains decoding so the reply parses directly
+    return get_llm(review_model(), num_predict=REVIEW_MAX_TOKENS, format="json")
+
+def new_review_llm() -> ChatOllama:
+    """Unshared review LLM with the same settings, for one event loop (see amain)."""
+    return build_llm(review_model(), num_predict=REVIEW_MAX_TOKENS, format="json")
+
+def _find_first_json_span(text: str, start: int) -> Optional[str]:
+    """
+    Single left-to-right scan from `start` (an opening brace) tracking nesting depth
+    and string state. Returns the first balanced {...} substring, or None.
+    """
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{" or ch == "[":
+            depth += 1
+        elif ch == "}" or ch == "]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
 def _extract_json(text: str):
     """Extract first valid JSON object from text output."""
-    import json
     start = text.find("{")
     if start == -1:
         return None
-    for end in range(len(text), start, -1):
-        snippet = text[start:end]
-        try:
-            return json.loads(snippet)
-        except Exception:
-            continue
-    return None
+    snippet = _find_first_json_span(text, start)
+    if snippet is None:
+        return None
+    try:
+        return orjson.loads(snippet)
+    except Exception:
+        return None
 
 def extract_first_json(text: str) -> Optional[Dict[str, Any]]:
     """
@@ -35,29 +94,22 @@ def extract_first_json(text: str) -> Optional[Dict[str, Any]]:
     """
     if not text or not isinstance(text, str):
         return None
-    # direct parse attempt
+    # direct parse attempt; always succeeds for JSON-mode models (see get_review_llm)
     try:
-        return json.loads(text.strip())
+        parsed = orjson.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
     except Exception:
         pass
 
-    # fallback: find first {...} block
-    matches = _extract_json(text)
-    if not matches:
+    # fallback for callers passing a free-form LLM: find first {...} block
+    match = _extract_json(text)
+    if not isinstance(match, dict):
         return None
-    return matches[0]
+    return match
 
-def model_review_prompt(entry: Dict[str, Any]) -> str:
-    """
-    Build a stable, deterministic prompt for scoring a saved self-edit entry.
-    """
-    q = entry.get("question", "")
-    a = entry.get("answer", "")
-    src = entry.get("source", "") or "unknown"
-    created = entry.get("created_at", "")
-
-    prompt = f"""
-You are a strict technical reviewer. Evaluate the following Question / Answer pair for quality as a training example.
+# review prompt pieces; the constant parts (including the threshold) are built once at import
+_PROMPT_PREFIX = f"""You are a strict technical reviewer. Evaluate the following Question / Answer pair for quality as a training example.
 Respond ONLY with a single JSON object (no extra text) with these keys:
   - accuracy: float between 0.0 and 1.0 (how factually correct the answer is)
   - clarity: float between 0.0 and 1.0 (how clear and unambiguous the Q/A are)
@@ -72,14 +124,28 @@ Important constraints:
   - If you cannot judge accuracy due to missing evidence, put accuracy=0.50 and explain briefly in remarks.
 
 Here is the item to evaluate (do not access the web; use the provided data only):
-Question: {q}
-Answer: {a}
-Source: {src}
-Created at: {created}
+Question: """
+_PROMPT_ANSWER = "\nAnswer: "
+_PROMPT_SOURCE = "\nSource: "
+_PROMPT_CREATED = "\nCreated at: "
+_PROMPT_SUFFIX = "\n\nOutput:"
 
-Output:
-"""
-    return prompt.strip()
+def model_review_prompt(entry: Dict[str, Any]) -> str:
+    """
+    Build a stable, deterministic prompt for scoring a saved self-edit entry.
+    """
+    q = str(entry.get("question", ""))
+    a = str(entry.get("answer", ""))
+    src = entry.get("source", "") or "unknown"
+    created = str(entry.get("created_at", ""))
+
+    return "".join((
+        _PROMPT_PREFIX, q,
+        _PROMPT_ANSWER, a,
+        _PROMPT_SOURCE, str(src),
+        _PROMPT_CREATED, created,
+        _PROMPT_SUFFIX,
+    )).strip()
 
 def review_entry_with_llm(llm: ChatOllama, entry: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -91,87 +157,164 @@ def review_entry_with_llm(llm: ChatOllama, entry: Dict[str, Any]) -> Dict[str, A
     # invoke model. Using llm.invoke(...) which returns an object with .content in this environment.
     try:
         resp = llm.invoke(prompt)
-        # attempt to read textual content
-        text = getattr(resp, "content", None)
-        if text is None:
-            # fallback: maybe resp is string-like
-            text = str(resp)
     except Exception as e:
         return {"error": f"LLM invocation failed: {e}", "debug_output": None}
 
+    return parse_review_response(resp)
+
+def _parse_review_json(resp: Any) -> Dict[str, Any]:
+    """
+    Extract the model's JSON and its raw numeric fields from one response.
+    Returns an error dict (with `debug_output`) when the response is unusable.
+    """
+    if isinstance(resp, Exception):
+        return {"error": f"LLM invocation failed: {resp}", "debug_output": None}
+
+    # attempt to read textual content
+    text = getattr(resp, "content", None)
+    if text is None:
+        # fallback: maybe resp is string-like
+        text = str(resp)
+
     parsed = extract_first_json(text)
     if parsed is None:
         # Save debug output for manual inspection
         return {"error": "failed to parse JSON from model response", "debug_output": text}
 
-    # Normalize numeric fields and boolean
     try:
-        accuracy = float(parsed.get("accuracy", 0.0))
-        clarity = float(parsed.get("clarity", 0.0))
-        novelty = float(parsed.get("novelty", 0.0))
+        raw = (
+            float(parsed.get("accuracy", 0.0)),
+            float(parsed.get("clarity", 0.0)),
+            float(parsed.get("novelty", 0.0)),
+        )
     except Exception:
         # If types are wrong, reject with debug
         return {"error": "parsed JSON missing numeric fields or wrong type", "parsed": parsed, "debug_output": text}
 
-    # Clip to [0.0, 1.0]
-    def clip(v):
-        v = float(v)
-        return max(0.0, min(1.0, v))
-    accuracy = round(clip(accuracy), 2)
-    clarity = round(clip(clarity), 2)
-    novelty = round(clip(novelty), 2)
-    score = round(accuracy * 0.5 + clarity * 0.3 + novelty * 0.2, 2)
-    approved = bool(parsed.get("approved", score >= APPROVAL_THRESHOLD))
-    remarks = str(parsed.get("remarks", "")).strip()
-    if len(remarks) > 200:
-        remarks = remarks[:197].rstrip() + "..."
-
-    return {
-        "accuracy": accuracy,
-        "clarity": clarity,
-        "novelty": novelty,
-        "score": score,
-        "approved": approved,
-        "remarks": remarks,
-        "raw_model_output": text if parsed is None else None,
-        "parsed_model_json": parsed
-    }
+    return {"parsed": parsed, "raw": raw}
+
+def parse_review_responses(responses: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Turn raw model responses (message objects, strings or exceptions) into structured review dicts.
+    Clipping and the weighted sum run as numpy passes over the whole batch; rounding uses
+    Python's round() so saved scores match the per-entry formula exactly.
+    """
+    results = [_parse_review_json(resp) for resp in responses]
+    ok = [i for i, r in enumerate(results) if "error" not in r]
+    if not ok:
+        return results
+
+    raw = np.array([results[i]["raw"] for i in ok], dtype=np.float64)
+    # NaN clamps to 1.0, as max(0.0, min(1.0, nan)) does
+    clipped = np.where(np.isnan(raw), 1.0, raw.clip(0.0, 1.0))
+    components = np.array([[round(v, 2) for v in row] for row in clipped.tolist()], dtype=np.float64)
+    # same operand order as accuracy*0.5 + clarity*0.3 + novelty*0.2
+    weighted = (
+        components[:, 0] * _SCORE_WEIGHTS[0]
+        + components[:, 1] * _SCORE_WEIGHTS[1]
+        + components[:, 2] * _SCORE_WEIGHTS[2]
+    )
+    scores = [round(v, 2) for v in weighted.tolist()]
+
+    for row, i in enumerate(ok):
+        parsed = results[i]["parsed"]
+        accuracy, clarity, novelty = components[row].tolist()
+        score = scores[row]
+        approved = bool(parsed.get("approved", score >= APPROVAL_THRESHOLD))
+        remarks = str(parsed.get("remarks", "")).strip()
+        if len(remarks) > 200:
+            remarks = remarks[:197].rstrip() + "..."
+
+        results[i] = {
+            "accuracy": accuracy,
+            "clarity": clarity,
+            "novelty": novelty,
+            "score": score,
+            "approved": approved,
+            "remarks": remarks,
+            "raw_model_output": None,
+            "parsed_model_json": parsed
+        }
+    return results
+
+def parse_review_response(resp: Any) -> Dict[str, Any]:
+    """Single-response convenience wrapper around parse_review_responses."""
+    return parse_review_responses([resp])[0]
+
+def _review_key(entry: Dict[str, Any]) -> bytes:
+    """Compact 16-byte BLAKE2b digest of question+answer, used to skip already-reviewed entries."""
+    text = (entry.get("question","") + "\n" + entry.get("answer","")).strip()
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
 
-def load_existing_reviewed(output_path: str) -> Dict[str, Dict[str, Any]]:
+def load_existing_reviewed(output_path: str) -> Set[bytes]:
     """
-    Load already-reviewed entries into an index keyed by a deterministic hash of question+answer.
-    Returns dict: hash -> reviewed_record
+    Load the keys of already-reviewed entries (deterministic hash of question+answer).
+    Only the 16-byte digests are kept, not the reviewed records themselves, so the
+    load cost is dominated by disk I/O rather than hashing or holding long strings.
+    Returns set of hashes.
     """
-    index = {}
+    index = set()
     if not os.path.exists(output_path):
         return index
     try:
-        with open(output_path, "r", encoding="utf-8") as fh:
+        with open(output_path, "rb") as fh:
             for line in fh:
                 line = line.strip()
                 if not line:
                     continue
                 try:
-                    rec = json.loads(line)
-                    key = (rec.get("question","") + "\n" + rec.get("answer","")).strip()
-                    index[key] = rec
+                    index.add(_review_key(orjson.loads(line)))
                 except Exception:
                     continue
     except Exception:
         pass
     return index
 
-def append_reviewed_record(output_path: str, record: Dict[str, Any]) -> None:
+def append_reviewed_record(output_path: str, record: Dict[str, Any], fh: Optional[BinaryIO] = None) -> None:
+    """
+    Append one reviewed record as a JSONL line. Pass an already-open binary handle
+    (as main does) to avoid an open/close per record; otherwise the file is opened here.
+    """
+    if fh is not None:
+        fh.write(orjson.dumps(record) + b"\n")
+        return
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "a", encoding="utf-8") as fh:
-        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with open(output_path, "ab") as out:
+        out.write(orjson.dumps(record) + b"\n")
+
+def _build_output_record(entry: Dict[str, Any], review_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap a review result with the entry it belongs to, ready to append to the reviewed file."""
+    output_record = {
+        "question": entry.get("question"),
+        "answer": entry.get("answer"),
+        "source": entry.get("source", "unknown"),
+        "created_at": entry.get("created_at"),
+        "reviewed_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
+        "review": review_result
+    }
+    # if review_result contains an 'error' key, mark as failed but still save for manual triage
+    if isinstance(review_result, dict) and "error" in review_result:
+        output_record["review_status"] = "error"
+    else:
+        output_record["review_status"] = "ok"
+    return output_record
 
-def main(input_path: str = DEFAULT_INPUT_PATH, output_path: str = DEFAULT_OUTPUT_PATH):
+async def amain(input_path: str = DEFAULT_INPUT_PATH, output_path: str = DEFAULT_OUTPUT_PATH,
+                concurrency: int = REVIEW_CONCURRENCY):
+    """
+    Review every new entry in `input_path` as a three-stage pipeline:
+    reader (parse + dedupe) -> `concurrency` reviewer workers -> writer.
+    File I/O and JSON parsing overlap with the in-flight LLM calls.
+    """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
+    # with no reviewer workers the reader would block forever once READ_AHEAD entries are queued
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
 
-    # prepare LLM (single instance)
-    llm = ChatOllama(model="llama3.1:8b-instruct-q4_K_M", temperature=0)
+    # prepare LLM: a fresh instance per run, because its async HTTP connections are
+    # tied to this event loop and main() starts a new loop on every call
+    llm = new_review_llm()
 
     # load index of already-reviewed to skip duplicates
     reviewed_index = load_existing_reviewed(output_path)
@@ -181,52 +324,99 @@ def main(input_path: str = DEFAULT_INPUT_PATH, output_path: str = DEFAULT_OUTPUT
     skipped = 0
     failed = 0
 
-    with open(input_path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            processed += 1
-            line = line.strip()
-            if not line:
-                continue
+    entries: asyncio.Queue = asyncio.Queue(maxsize=READ_AHEAD)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def reader():
+        nonlocal processed, skipped, failed
+        with open(input_path, "rb") as fh:
+            for line in fh:
+                processed += 1
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                except Exception:
+                    failed += 1
+                    print(f"[WARN] Skipping invalid JSON line #{processed}")
+                    continue
+
+                key = _review_key(entry)
+                if key in reviewed_index:
+                    skipped += 1
+                    continue
+                # mark as taken now so repeats later in the input are skipped too
+                reviewed_index.add(key)
+                await entries.put(entry)
+        for _ in range(concurrency):
+            await entries.put(None)
+
+    async def reviewer():
+        while (entry := await entries.get()) is not None:
             try:
-                entry = json.loads(line)
-            except Exception:
-                failed += 1
-                print(f"[WARN] Skipping invalid JSON line #{processed}")
-                continue
-
-            key = (entry.get("question","") + "\n" + entry.get("answer","")).strip()
-            if key in reviewed_index:
-                skipped += 1
-                continue
-
-            # run review
-            review_result = review_entry_with_llm(llm, entry)
-
-            # build output record
-            output_record = {
-                "question": entry.get("question"),
-                "answer": entry.get("answer"),
-                "source": entry.get("source", "unknown"),
-                "created_at": entry.get("created_at"),
-                "reviewed_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
-                "review": review_result
-            }
-
-            # if review_result contains an 'error' key, mark as failed but still save for manual triage
-            if isinstance(review_result, dict) and "error" in review_result:
-                failed += 1
-                output_record["review_status"] = "error"
-            else:
-                appended += 1
-                output_record["review_status"] = "ok"
-
-            append_reviewed_record(output_path, output_record)
-            reviewed_index[key] = output_record
+                resp = await llm.ainvoke(model_review_prompt(entry))
+            except Exception as e:
+                resp = e
+            await results.put((entry, resp))
+
+    async def review_all():
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(reader())
+            for _ in range(concurrency):
+                tg.create_task(reviewer())
+        await results.put(None)
+
+    async def writer():
+        nonlocal appended, failed
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        written = 0
+        done = False
+        with open(output_path, "ab", buffering=1 << 20) as out:
+            while not done:
+                # take whatever has finished so scoring runs as one numpy pass per drain
+                batch = [await results.get()]
+                while not results.empty():
+                    batch.append(results.get_nowait())
+                if batch[-1] is None:
+                    done = True
+                    batch.pop()
+                if not batch:
+                    continue
+
+                review_results = parse_review_responses([resp for _, resp in batch])
+                for (entry, _), review_result in zip(batch, review_results):
+                    output_record = _build_output_record(entry, review_result)
+                    if output_record["review_status"] == "error":
+                        failed += 1
+                    else:
+                        appended += 1
+                    append_reviewed_record(output_path, output_record, fh=out)
+                    written += 1
+                    if written % FSYNC_EVERY == 0:
+                        out.flush()
+                        os.fsync(out.fileno())
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(review_all())
+            tg.create_task(writer())
+    finally:
+        await aclose_llm(llm)
 
     print(f"Processed: {processed}, Appended: {appended}, Skipped(already reviewed): {skipped}, Failed: {failed}")
     print(f"Reviewed file: {output_path}")
 
+def main(input_path: str = DEFAULT_INPUT_PATH, output_path: str = DEFAULT_OUTPUT_PATH,
+         concurrency: int = REVIEW_CONCURRENCY):
+    asyncio.run(amain(input_path=input_path, output_path=output_path, concurrency=concurrency))
+
 if __name__ == "__main__":
     inp = os.getenv("REVIEW_INPUT", DEFAULT_INPUT_PATH)
     outp = os.getenv("REVIEW_OUTPUT", DEFAULT_OUTPUT_PATH)
-    main(input_path=inp, output_path=outp)
+    conc = os.getenv("REVIEW_CONCURRENCY", str(REVIEW_CONCURRENCY))
+    try:
+        conc = int(conc)
+    except ValueError:
+        raise SystemExit(f"REVIEW_CONCURRENCY must be an integer, got {conc!r}")
+    main(input_path=inp, output_path=outp, concurrency=conc)
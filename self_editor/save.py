@@ -1,43 +1,130 @@
 # self_editor/save.py
-import json
 import os
+import math
 import hashlib
-from typing import Dict, Tuple
+import orjson
+from typing import Dict, Optional, Set, Tuple, Union
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 OUT_PATH = os.path.join(DATA_DIR, "self_edits.jsonl")
-INDEX_PATH = os.path.join(DATA_DIR, "self_edits_index.json")  # small dedupe index
+INDEX_PATH = os.path.join(DATA_DIR, "self_edits_index.txt")  # append-only dedupe log, one hash per line
+
+# past this many entries the exact hash set is swapped for a Bloom filter (~10 bits/entry)
+BLOOM_THRESHOLD = 100_000
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.001
+
+class _BloomFilter:
+    """Minimal Bloom filter over hex blake2b digests, backed by a bytearray."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, h: str):
+        # the digest is already uniform: split it into two 64-bit halves for double hashing
+        d = bytes.fromhex(h)
+        a = int.from_bytes(d[:8], "little")
+        b = int.from_bytes(d[8:], "little") | 1
+        return ((a + i * b) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, h: str) -> None:
+        for p in self._positions(h):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, h: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(h))
+
+# lazily loaded once per process; see _get_index()
+_INDEX: Optional[Union[Set[str], _BloomFilter]] = None
 
 def _hash_edit(edit: Dict[str, str]) -> str:
     """Deterministic hash of question+answer for simple dedupe."""
-    key = (edit.get("question","") + "\n" + edit.get("answer","")).encode("utf-8")
-    return hashlib.sha256(key).hexdigest()
-
-def _load_index() -> Dict[str, bool]:
-    """Load or create in-memory index of hashes to avoid duplicates."""
-    if not os.path.exists(INDEX_PATH):
-        return {}
-    try:
+    # feed the parts separately rather than building question + "\n" + answer first
+    h = hashlib.blake2b(digest_size=16)
+    h.update(edit.get("question","").encode("utf-8"))
+    h.update(b"\n")
+    h.update(edit.get("answer","").encode("utf-8"))
+    return h.hexdigest()
+
+def _maybe_bloom(index: Union[Set[str], _BloomFilter]) -> Union[Set[str], _BloomFilter]:
+    """Swap a large exact set for a Bloom filter to bound memory."""
+    if isinstance(index, set) and len(index) > BLOOM_THRESHOLD:
+        bloom = _BloomFilter(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+        for h in index:
+            bloom.add(h)
+        return bloom
+    return index
+
+def _rebuild_index() -> Union[Set[str], _BloomFilter]:
+    """Recreate the hash log from the JSONL file (first run or lost index)."""
+    index = set()
+    if os.path.exists(OUT_PATH):
+        with open(OUT_PATH, "rb") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    index.add(_hash_edit(orjson.loads(line)))
+                except Exception:
+                    continue
+    if index:
+        with open(INDEX_PATH, "w", encoding="utf-8") as f:
+            f.writelines(h + "\n" for h in index)
+    return _maybe_bloom(index)
+
+def _get_index() -> Union[Set[str], _BloomFilter]:
+    """Load the hash log on first use (exact set, or Bloom filter for very large histories)."""
+    global _INDEX
+    if _INDEX is None:
+        if not os.path.exists(INDEX_PATH):
+            _INDEX = _rebuild_index()
+            return _INDEX
+        index = set()
         with open(INDEX_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+            for line in f:
+                h = line.strip()
+                if not h:
+                    continue
+                if len(h) != 32:
+                    # index written by an older hash scheme (e.g. sha256): start over from the JSONL
+                    _INDEX = _rebuild_index()
+                    return _INDEX
+                index.add(h)
+                if isinstance(index, set) and len(index) > BLOOM_THRESHOLD:
+                    index = _maybe_bloom(index)
+        _INDEX = index
+    return _INDEX
 
-def _save_index(index: Dict[str, bool]) -> None:
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(INDEX_PATH, "w", encoding="utf-8") as f:
-        json.dump(index, f, ensure_ascii=False, indent=2)
+def _in_jsonl(h: str) -> bool:
+    """Confirm a Bloom filter hit by scanning the JSONL file (rare: false positives only)."""
+    if not os.path.exists(OUT_PATH):
+        return False
+    with open(OUT_PATH, "rb") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                if _hash_edit(orjson.loads(line)) == h:
+                    return True
+            except Exception:
+                continue
+    return False
 
 def append_self_edit(edit: Dict[str, str]) -> Tuple[str, bool]:
     """
     Append a validated self-edit to the JSONL file.
     Returns (path, appended_bool). If duplicate found, it's skipped (returns False).
     """
+    global _INDEX
     os.makedirs(DATA_DIR, exist_ok=True)
-    idx = _load_index()
+    idx = _get_index()
     h = _hash_edit(edit)
 
-    if h in idx:
+    if h in idx and (isinstance(idx, set) or _in_jsonl(h)):
         return OUT_PATH, False  # duplicate, skip
 
     # prepare object to save: include minimal metadata
@@ -49,12 +136,14 @@ def append_self_edit(edit: Dict[str, str]) -> Tuple[str, bool]:
     }
 
     # Append line
-    with open(OUT_PATH, "a", encoding="utf-8") as fh:
-        fh.write(json.dumps(save_obj, ensure_ascii=False) + "\n")
+    with open(OUT_PATH, "ab") as fh:
+        fh.write(orjson.dumps(save_obj) + b"\n")
 
     # Update index
-    idx[h] = True
-    _save_index(idx)
+    with open(INDEX_PATH, "a", encoding="utf-8") as f:
+        f.write(h + "\n")
+    idx.add(h)
+    _INDEX = _maybe_bloom(idx)
 
     return OUT_PATH, True
 
@@ -1,22 +1,25 @@
 # self_editor/validate.py
-import re
 from typing import Dict, Any
 
 # Limits you can tune
 MAX_QUESTION_LEN = 240
 MAX_ANSWER_LEN = 4000
 
-_CONTROL_RE = re.compile(r"[\x00-\x1f\x7f]")  # control chars
+# str.translate table deleting ASCII control chars (0x00-0x1f, 0x7f)
+_CTRL_TABLE = dict.fromkeys(range(0x20), None) | {0x7f: None}
 
 def _clean_text(s: str) -> str:
     """Trim, collapse whitespace, strip control characters."""
     if s is None:
         return ""
     s = str(s)
-    s = _CONTROL_RE.sub("", s)
-    # collapse multiple spaces/newlines into single space, but keep some newlines
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    # fast path for already-clean text: isprintable() is False for control chars and
+    # for every whitespace char except a plain space, so nothing below would change s
+    if s.isprintable() and "  " not in s and s == s.strip():
+        return s
+    s = s.translate(_CTRL_TABLE)
+    # collapse runs of whitespace into a single space and trim both ends
+    return " ".join(s.split())
 
 def validate_self_edit(obj: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("langchain_ollama")
+pytest.importorskip("orjson")
+pytest.importorskip("numpy")
+
+from self_editor import review_selfedits
+
+REVIEW_JSON = '{"accuracy": 0.9, "clarity": 0.8, "novelty": 0.5, "remarks": "ok"}'
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    """Answers /api/chat with a fixed review, keeping connections alive like Ollama does."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        lines = [
+            {"model": body["model"], "created_at": "2025-01-01T00:00:00Z",
+             "message": {"role": "assistant", "content": REVIEW_JSON}, "done": False},
+            {"model": body["model"], "created_at": "2025-01-01T00:00:00Z",
+             "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop"},
+        ]
+        payload = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_host(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OLLAMA_HOST", f"http://127.0.0.1:{server.server_address[1]}")
+    yield
+    server.shutdown()
+
+
+def _write_entries(path, start, stop):
+    with open(path, "a", encoding="utf-8") as fh:
+        for i in range(start, stop):
+            fh.write(json.dumps({"question": f"What is item {i}?", "answer": f"Item {i} is a test."}) + "\n")
+
+
+def test_main_twice_in_one_process(tmp_path, ollama_host):
+    inp = tmp_path / "self_edits.jsonl"
+    out = tmp_path / "self_edits_reviewed.jsonl"
+
+    _write_entries(inp, 0, 10)
+    review_selfedits.main(str(inp), str(out))
+    # a second run gets a new event loop; it must not reuse the first run's connections
+    _write_entries(inp, 10, 20)
+    review_selfedits.main(str(inp), str(out))
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 20
+    assert [r for r in records if r["review_status"] != "ok"] == []